@@ -14,12 +14,24 @@ This is intentionally defensive so it can be used on unknown or partial exports.
 """
 from __future__ import annotations
 
+import ast
+import copy
+import errno
+import functools
 import json
+import mmap
 import os
+import struct
 from typing import Dict, Optional, Tuple
 
 import numpy as np
 
+try:  # orjson is optional; it parses JSON several times faster than stdlib
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 
 def find_recordings(root: str) -> list:
     """Return list of recording subfolder paths (e.g., recording/0, recording/1)."""
@@ -37,67 +49,207 @@ def find_recordings(root: str) -> list:
 def read_inf(path: str) -> Dict:
     """Try to read an .inf metadata file and parse JSON or key=value pairs.
 
-    If parsing fails, returns {'raw_bytes': b'...'} as a fallback.
+    If parsing fails, returns {'raw_bytes': b'...'} as a fallback. Results are
+    cached per (path, mtime, size), so re-reading an unchanged file is cheap.
     """
     if not os.path.exists(path):
         return {}
-    # read as bytes and try multiple decodings/parsers
+    st = os.stat(path)
+    # deep copy (metadata is small) so callers can't mutate the cached entry,
+    # including nested JSON lists/dicts
+    return copy.deepcopy(_read_inf_cached(path, st.st_mtime_ns, st.st_size))
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_inf_cached(path: str, mtime_ns: int, size: int) -> Dict:
+    # read as bytes and try multiple parsers
     with open(path, "rb") as f:
         raw = f.read()
+    # sidecars saved with np.save
+    if raw.startswith(np.lib.format.MAGIC_PREFIX):
+        try:
+            return {"array": fast_load_npy(raw)}
+        except ValueError:
+            pass
 
-    # try JSON
-    try:
-        text = raw.decode("utf-8")
-        data = json.loads(text)
-        if isinstance(data, dict):
-            return data
-    except Exception:
-        pass
+    text = raw.decode("utf-8", errors="ignore")
+
+    # try JSON (only worth it if the text looks like an object)
+    if text.lstrip().startswith("{"):
+        try:
+            data = _json_loads(raw)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
 
     # try simple text key=value lines
-    try:
-        text = raw.decode("utf-8", errors="ignore")
-        lines = [l.strip() for l in text.splitlines() if l.strip()]
-        out = {}
-        for L in lines:
-            if "=" in L:
-                k, v = L.split("=", 1)
-                out[k.strip()] = v.strip()
-        if out:
-            return out
-    except Exception:
-        pass
+    out = {}
+    for L in text.splitlines():
+        L = L.strip()
+        if "=" in L:
+            k, v = L.split("=", 1)
+            out[k.strip()] = v.strip()
+    if out:
+        return out
 
     # fallback: return raw bytes (hex string to keep JSON-serializable)
     return {"raw_bytes_hex": raw.hex()[:1024]}
 
 
+# Candidate (dtype, channels) pairs in preference order, as (bytes-per-frame - 1,
+# dtype, channels). Every frame size is a power of two, so divisibility is a mask
+# test. Reduced from the full search over float32/int16/int32 x 8/16/32/64/4
+# channels: a frame size divisible by 32 always hits float32 x 8 first, and int32
+# frames equal float32 ones, so only these three outcomes are reachable.
+_LAYOUT_CANDIDATES = (
+    (31, np.float32, 8),
+    (15, np.float32, 4),
+    (7, np.int16, 4),
+)
+
+
 def _infer_dtype_and_channels(raw_path: str) -> Tuple[np.dtype, int]:
     """Heuristic: try a few dtypes and channel counts, return a plausible pair."""
     filesize = os.path.getsize(raw_path)
-    # candidate dtypes (numpy dtype and byte size)
-    candidates = [(np.float32, 4), (np.int16, 2), (np.int32, 4)]
-    channel_options = [8, 16, 32, 64, 4]
-
-    for dtype, bsz in candidates:
-        for ch in channel_options:
-            if filesize % (bsz * ch) == 0:
-                return dtype, ch
+    for mask, dtype, ch in _LAYOUT_CANDIDATES:
+        if filesize & mask == 0:
+            return dtype, ch
 
     # fallback
     return np.float32, 8
 
 
-def load_eeg(raw_path: str, n_channels: Optional[int] = None, dtype: Optional[np.dtype] = None) -> Tuple[np.ndarray, Dict]:
-    """Load EEG raw file into a NumPy array shaped (n_samples, n_channels).
+# (abspath(root), name) -> (dtype, n_channels); misses are not cached
+_WORKSPACE_LAYOUTS: Dict[Tuple[str, str], Tuple[np.dtype, int]] = {}
 
-    Parameters
-    - raw_path: path to .raw file
-    - n_channels: optional, force number of channels
-    - dtype: optional numpy dtype to use (e.g., np.float32)
 
-    Returns (data, info). `info` contains inferred dtype, n_channels and n_samples.
+def workspace_layout(root: str, name: str = "eeg.raw") -> Optional[Tuple[np.dtype, int]]:
+    """Infer (dtype, n_channels) of `name` once per workspace and cache it.
+
+    Recordings in one `.nextmind` workspace share their layout, so the first
+    recording that has `name` decides it; pass the result to `load_eeg` to skip
+    per-file inference. Returns None if no recording has that file (yet); that
+    result is not cached, so a later call sees newly added recordings.
+    """
+    key = (os.path.abspath(root), name)
+    layout = _WORKSPACE_LAYOUTS.get(key)
+    if layout is None:
+        for rec in find_recordings(key[0]):
+            path = os.path.join(rec, name)
+            if os.path.exists(path):
+                layout = _WORKSPACE_LAYOUTS[key] = _infer_dtype_and_channels(path)
+                break
+    return layout
+
+
+def _read_raw(raw_path: str, dtype) -> np.ndarray:
+    """Read a whole `.raw` file as a flat array of `dtype`.
+
+    Fills a preallocated buffer with unbuffered `readinto`, which avoids the
+    copy/sync overhead of `np.fromfile`. Trailing bytes that do not make up a
+    full item are ignored, as with `np.fromfile`.
+    """
+    dtype = np.dtype(dtype)
+    n = os.path.getsize(raw_path) // dtype.itemsize
+    buf = np.empty(n, dtype=dtype)
+    view = memoryview(buf).cast("B")
+    with open(raw_path, "rb", buffering=0) as f:
+        pos = 0
+        while pos < len(view):
+            got = f.readinto(view[pos:])
+            if not got:
+                # file shrank under us; keep what was read
+                return buf[: pos // dtype.itemsize]
+            pos += got
+    return buf
+
+
+def _map_raw(raw_path: str, dtype) -> np.ndarray:
+    """Map a whole `.raw` file read-only as a flat array of `dtype` (zero-copy).
+
+    Pages are faulted in by the OS on access; the mapping is advised for
+    sequential reads where the platform supports it.
     """
+    dtype = np.dtype(dtype)
+    n = os.path.getsize(raw_path) // dtype.itemsize
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    with open(raw_path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return np.frombuffer(mm, dtype=dtype, count=n)
+
+
+# liburing names used by `_read_raw_iouring` (older bindings lack Ring/Iovec)
+_LIBURING_API = ("Ring", "Cqe", "Iovec", "io_uring_queue_init", "io_uring_queue_exit",
+                 "io_uring_get_sqe", "io_uring_prep_readv", "io_uring_submit",
+                 "io_uring_wait_cqe", "io_uring_cqe_seen", "trap_error")
+
+
+def _read_raw_iouring(raw_path: str, dtype, queue_depth: int = 64) -> np.ndarray:
+    """Read a whole `.raw` file with io_uring and O_DIRECT (Linux only).
+
+    Reads bypass the page cache and are issued as batched async requests into a
+    page-aligned buffer (an anonymous mmap satisfies O_DIRECT's alignment).
+    Raises ImportError if the `liburing` bindings (or the API used here) or
+    `os.O_DIRECT` are missing, and OSError if the kernel or filesystem refuses
+    (e.g. EINVAL for O_DIRECT on tmpfs/NFS).
+    """
+    import liburing
+
+    missing = [name for name in _LIBURING_API if not hasattr(liburing, name)]
+    if missing:
+        raise ImportError("liburing bindings lack " + ", ".join(missing))
+    if not hasattr(os, "O_DIRECT"):
+        raise ImportError("os.O_DIRECT is not available on this platform")
+
+    dtype = np.dtype(dtype)
+    filesize = os.path.getsize(raw_path)
+    n = filesize // dtype.itemsize
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    # O_DIRECT needs block-aligned lengths/offsets; over-allocate to a page
+    alloc = -(-filesize // mmap.PAGESIZE) * mmap.PAGESIZE
+    # adaptive request size: small files in 64 KB reads, large ones up to 16 MB
+    chunk = min(max(alloc // queue_depth, 64 << 10), 16 << 20)
+    chunk = -(-chunk // mmap.PAGESIZE) * mmap.PAGESIZE
+
+    buf = mmap.mmap(-1, alloc)
+    view = memoryview(buf)
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    fd = os.open(raw_path, os.O_RDONLY | os.O_DIRECT)
+    try:
+        liburing.io_uring_queue_init(queue_depth, ring)
+        try:
+            iovecs = {}  # offset -> Iovec, kept alive until its read completes
+            offset = total = 0
+            while offset < alloc or iovecs:
+                while offset < alloc and len(iovecs) < queue_depth:
+                    iov = liburing.Iovec([view[offset:offset + chunk]])
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_readv(sqe, fd, iov, offset)
+                    sqe.user_data = offset
+                    iovecs[offset] = iov
+                    offset += chunk
+                liburing.io_uring_submit(ring)
+                liburing.io_uring_wait_cqe(ring, cqe)
+                entry = cqe[0]
+                total += liburing.trap_error(entry.res)
+                del iovecs[entry.user_data]
+                liburing.io_uring_cqe_seen(ring, entry)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+    finally:
+        os.close(fd)
+    if total < filesize:
+        raise OSError(errno.EIO, "short io_uring read", raw_path)
+    return np.frombuffer(buf, dtype=dtype, count=n)
+
+
+def _resolve_layout(raw_path: str, n_channels: Optional[int], dtype: Optional[np.dtype]) -> Tuple[np.dtype, int]:
     if not os.path.exists(raw_path):
         raise FileNotFoundError(raw_path)
 
@@ -105,16 +257,20 @@ def load_eeg(raw_path: str, n_channels: Optional[int] = None, dtype: Optional[np
         inferred_dtype, inferred_ch = _infer_dtype_and_channels(raw_path)
         dtype = dtype or inferred_dtype
         n_channels = n_channels or inferred_ch
+    return dtype, n_channels
 
-    # read raw data
-    data = np.fromfile(raw_path, dtype=dtype)
+
+_LAYOUTS = ("sample_major", "channel_major")
+
+
+def _reshape_eeg(data: np.ndarray, raw_path: str, n_channels: int, dtype, layout: str = "sample_major") -> Tuple[np.ndarray, Dict]:
+    if layout not in _LAYOUTS:
+        raise ValueError("Unknown layout %r (expected one of %s)" % (layout, ", ".join(_LAYOUTS)))
     if data.size == 0:
         raise ValueError("Empty EEG file: %s" % raw_path)
 
     if data.size % n_channels != 0:
         # If shape doesn't fit, try to re-infer channels with dtype fixed
-        filesize = os.path.getsize(raw_path)
-        bsz = np.dtype(dtype).itemsize
         possible = []
         for ch in [4, 8, 16, 32, 64]:
             if data.size % ch == 0:
@@ -128,11 +284,50 @@ def load_eeg(raw_path: str, n_channels: Optional[int] = None, dtype: Optional[np
 
     n_samples = data.size // n_channels
     data = data.reshape((n_samples, n_channels))
+    if layout == "channel_major":
+        # contiguous copy so each channel is one linear stream for the filters
+        data = np.ascontiguousarray(data.T)
 
     info = {"dtype": str(dtype), "n_channels": n_channels, "n_samples": n_samples}
     return data, info
 
 
+def load_eeg(raw_path: str, n_channels: Optional[int] = None, dtype: Optional[np.dtype] = None, mmap: bool = True, layout: str = "sample_major") -> Tuple[np.ndarray, Dict]:
+    """Load EEG raw file into a NumPy array shaped (n_samples, n_channels).
+
+    Parameters
+    - raw_path: path to .raw file
+    - n_channels: optional, force number of channels
+    - dtype: optional numpy dtype to use (e.g., np.float32)
+    - mmap: if True (default), return a read-only memory-mapped view of the
+      file instead of reading it into RAM; use `np.array(data)` when a
+      writable copy is needed
+    - layout: "sample_major" (default) or "channel_major", which returns a
+      contiguous (n_channels, n_samples) copy; pass `axis=1` to the
+      shielding functions for that layout
+
+    Returns (data, info). `info` contains inferred dtype, n_channels and n_samples.
+    """
+    dtype, n_channels = _resolve_layout(raw_path, n_channels, dtype)
+    data = _map_raw(raw_path, dtype) if mmap else _read_raw(raw_path, dtype)
+    return _reshape_eeg(data, raw_path, n_channels, dtype, layout)
+
+
+def load_eeg_iouring(raw_path: str, n_channels: Optional[int] = None, dtype: Optional[np.dtype] = None, layout: str = "sample_major") -> Tuple[np.ndarray, Dict]:
+    """Like `load_eeg`, but read through io_uring + O_DIRECT when possible.
+
+    Intended for cold-cache loads of large recordings on Linux/NVMe. Falls back
+    to the regular buffered read if `liburing` is not installed or the
+    filesystem rejects O_DIRECT.
+    """
+    dtype, n_channels = _resolve_layout(raw_path, n_channels, dtype)
+    try:
+        data = _read_raw_iouring(raw_path, dtype)
+    except (ImportError, OSError):
+        data = _read_raw(raw_path, dtype)
+    return _reshape_eeg(data, raw_path, n_channels, dtype, layout)
+
+
 def load_events(raw_path: str) -> Tuple[np.ndarray, Dict]:
     """Try to load an events/raw file.
 
@@ -143,7 +338,7 @@ def load_events(raw_path: str) -> Tuple[np.ndarray, Dict]:
         return np.array([]), {}
     for dtype in (np.float32, np.int32, np.int16):
         try:
-            arr = np.fromfile(raw_path, dtype=dtype)
+            arr = _read_raw(raw_path, dtype)
             if arr.size > 0:
                 return arr, {"dtype": str(dtype), "n_events": arr.size}
         except Exception:
@@ -152,6 +347,77 @@ def load_events(raw_path: str) -> Tuple[np.ndarray, Dict]:
     return np.array([]), {"raw_bytes": os.path.getsize(raw_path)}
 
 
+def fast_load_npy(buf) -> np.ndarray:
+    """Zero-copy view of `.npy` file contents held in `buf` (bytes, memoryview, mmap).
+
+    Parses the header directly instead of going through `np.load(BytesIO(...))`.
+    The result shares memory with `buf` (read-only for bytes). Object arrays are
+    not supported.
+    """
+    mv = memoryview(buf)
+    prefix = np.lib.format.MAGIC_PREFIX
+    if bytes(mv[:len(prefix)]) != prefix:
+        raise ValueError("Not a .npy buffer (bad magic)")
+    if len(mv) < len(prefix) + 2:
+        raise ValueError("Truncated .npy buffer")
+    major = mv[len(prefix)]
+    if major == 1:
+        start = 10
+    elif major in (2, 3):
+        start = 12
+    else:
+        raise ValueError("Unsupported .npy version %d" % major)
+    if len(mv) < start:
+        raise ValueError("Truncated .npy buffer")
+    (hlen,) = struct.unpack("<H" if major == 1 else "<I", mv[8:start])
+    encoding = "utf8" if major == 3 else "latin1"
+    try:
+        header = ast.literal_eval(bytes(mv[start:start + hlen]).decode(encoding))
+    except (SyntaxError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid .npy header") from exc
+    if not isinstance(header, dict) or not {"descr", "fortran_order", "shape"} <= header.keys():
+        raise ValueError("Invalid .npy header: %r" % (header,))
+
+    shape = header["shape"]
+    if not isinstance(shape, tuple) or not all(isinstance(d, int) and d >= 0 for d in shape):
+        raise ValueError("Invalid .npy shape: %r" % (shape,))
+    try:
+        dtype = np.lib.format.descr_to_dtype(header["descr"])
+        if dtype.hasobject:
+            raise ValueError("Object arrays are not supported")
+        count = 1
+        for dim in shape:
+            count *= dim
+        arr = np.frombuffer(mv, dtype=dtype, count=count, offset=start + hlen)
+        if header["fortran_order"]:
+            return arr.reshape(shape[::-1]).T
+        return arr.reshape(shape)
+    except (TypeError, IndexError, KeyError) as exc:
+        # malformed descr/shape; keep the single ValueError contract
+        raise ValueError("Invalid .npy contents: %s" % exc) from exc
+
+
+def save_npy_aligned(path: str, arr: np.ndarray, alignment: int = 4096) -> None:
+    """Save `arr` as an uncompressed `.npy` whose data starts on an `alignment` boundary.
+
+    The header is padded with spaces (still a valid v1.0 header, readable by
+    `np.load`), so the array data is page-aligned for mmap and O_DIRECT reads.
+    """
+    arr = np.asarray(arr)
+    if arr.dtype.hasobject:
+        raise ValueError("Object arrays are not supported")
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(arr.dtype), arr.shape)
+    prefix = len(np.lib.format.MAGIC_PREFIX) + 4  # magic + version + uint16 length
+    total = -(-(prefix + len(header) + 1) // alignment) * alignment
+    header = header.ljust(total - prefix - 1) + "\n"
+    with open(path, "wb") as f:
+        f.write(np.lib.format.MAGIC_PREFIX + b"\x01\x00")
+        f.write(struct.pack("<H", len(header)))
+        f.write(header.encode("latin1"))
+        arr.tofile(f)
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -1,19 +1,30 @@
 """Example runner: load a recording and apply shielding.
 
-Usage: python run_example.py [path/to/recording/0]
+Usage: python run_example.py [path/to/recording/0] [lz4]
+
+Writes `eeg_cleaned.npy` (page-aligned, uncompressed), `eeg_mask.npy` and
+`eeg_cleaned_info.json` next to the recording. Pass `lz4` to instead store the
+cleaned data as `eeg_cleaned.b2` compressed with blosc2 (needs `blosc2`).
 """
 from __future__ import annotations
 
+import json
 import os
+import platform
 import sys
+from typing import Optional
 
 import numpy as np
 
-from nextmind_reader import load_eeg, read_inf
+from nextmind_reader import load_eeg, load_eeg_iouring, read_inf, save_npy_aligned, workspace_layout
 from shielding import apply_shielding_pipeline
 
 
-def main(rec_path: str):
+def main(rec_path: str, compression: Optional[str] = None):
+    if compression not in (None, "lz4"):
+        print("Unknown compression:", compression)
+        return 2
+
     # prefer preprocessed if available
     paths = [os.path.join(rec_path, "eeg_preprocessed.raw"), os.path.join(rec_path, "eeg.raw")]
     raw = None
@@ -26,7 +37,16 @@ def main(rec_path: str):
         return 2
 
     print("Loading:", raw)
-    data, info = load_eeg(raw)
+    # on Linux, bypass the page cache for cold loads of large recordings
+    loader = load_eeg_iouring if platform.system() == "Linux" else load_eeg
+    # recordings in a workspace share a layout; infer it once for the workspace
+    root = os.path.dirname(os.path.dirname(os.path.abspath(rec_path)))
+    layout = workspace_layout(root, os.path.basename(raw))
+    if layout is not None:
+        dtype, n_channels = layout
+        data, info = loader(raw, n_channels=n_channels, dtype=dtype)
+    else:
+        data, info = loader(raw)
     print("Shape:", data.shape, "info:", info)
 
     # Try to get sample rate from eeg.inf if present
@@ -42,12 +62,24 @@ def main(rec_path: str):
     print("Cleaned shape:", cleaned.shape)
     print("Good samples fraction:", mask.mean())
 
-    out_npz = os.path.join(rec_path, "eeg_cleaned.npz")
-    np.savez_compressed(out_npz, cleaned=cleaned, mask=mask, info=info)
-    print("Saved cleaned data to", out_npz)
+    if compression == "lz4":
+        import blosc2
+
+        out_cleaned = os.path.join(rec_path, "eeg_cleaned.b2")
+        with open(out_cleaned, "wb") as f:
+            f.write(blosc2.pack_array2(np.ascontiguousarray(cleaned), cparams={"codec": blosc2.Codec.LZ4}))
+    else:
+        # uncompressed and page-aligned: fast to write and to mmap back in
+        out_cleaned = os.path.join(rec_path, "eeg_cleaned.npy")
+        save_npy_aligned(out_cleaned, cleaned)
+    np.save(os.path.join(rec_path, "eeg_mask.npy"), mask)
+    with open(os.path.join(rec_path, "eeg_cleaned_info.json"), "w") as f:
+        json.dump(info, f)
+    print("Saved cleaned data to", out_cleaned)
     return 0
 
 
 if __name__ == "__main__":
     rec = sys.argv[1] if len(sys.argv) > 1 else "."
-    sys.exit(main(rec))
+    compression = sys.argv[2] if len(sys.argv) > 2 else None
+    sys.exit(main(rec, compression))
@@ -4,9 +4,11 @@
 # relative corrective blocks (classical-conditional corrections
 # addressed relative to a measured qubit index).
 
-from typing import List, Tuple, Dict, Any
+import hashlib
+from typing import List, Optional, Tuple, Dict, Any
 
-from qiskit import QuantumCircuit, ClassicalRegister
+from qiskit import QuantumCircuit, ClassicalRegister, qasm3, transpile
+from qiskit.circuit import Clbit
 from qiskit_aer import AerSimulator
 
 
@@ -14,19 +16,41 @@ class TemporalFlexCircuit:
     """Helper to build circuits where corrective (classical-conditional)
     gates are applied relative to a previously measured qubit index.
 
-    The class keeps a list of single-bit classical registers created when
-    measuring qubits so each measurement result is stored in its own
-    ClassicalRegister(1). This makes it easy to apply conditional gates based
-    on measurement outcomes.
+    Measurement results go into a preallocated ClassicalRegister of
+    `max_measurements` bits (default: one per qubit); each measure() takes the
+    next free bit. When all bits are used, another register as large as all
+    existing ones is added, so any number of measurements works while the
+    register count only grows logarithmically (counts keys then hold one
+    space-separated bitstring per register). Conditional gates are applied on
+    the single measured bit.
     """
 
-    def __init__(self, n_qubits: int):
+    _backend: Optional[AerSimulator] = None  # shared simulator, created on first run
+
+    # gate name -> (QuantumCircuit method, number of qubit arguments)
+    _DISPATCH: Dict[str, Tuple[Any, int]] = {
+        'h': (QuantumCircuit.h, 1),
+        'x': (QuantumCircuit.x, 1),
+        'z': (QuantumCircuit.z, 1),
+        's': (QuantumCircuit.s, 1),
+        't': (QuantumCircuit.t, 1),
+        'cx': (QuantumCircuit.cx, 2),
+        'swap': (QuantumCircuit.swap, 2),
+    }
+
+    def __init__(self, n_qubits: int, max_measurements: Optional[int] = None):
         self.n: int = int(n_qubits)
         self.qc: QuantumCircuit = QuantumCircuit(n_qubits)
-        self.cregs: List[ClassicalRegister] = []  # list of ClassicalRegister(1)
-        self.measure_map: Dict[int, int] = {}     # measured_qubit -> creg index
-
-    def add_layer(self, gates: List[Tuple]) -> None:
+        n_bits = self.n if max_measurements is None else int(max_measurements)
+        self._clbits: List[Clbit] = []            # all preallocated classical bits, in order
+        self._add_clbits(max(n_bits, 1))
+        self.n_measured: int = 0                  # classical bits used so far
+        self.measure_map: Dict[int, int] = {}     # measured_qubit -> clbit index
+        # (qasm3 digest, compiled) of the last run; the circuit only grows, so
+        # older entries could never be hit again
+        self._transpiled: Optional[Tuple[str, QuantumCircuit]] = None
+
+    def add_layer(self, gates: List[Tuple], validate: bool = True) -> None:
         """Append a small layer described by tuples.
 
         Supported formats:
@@ -37,54 +61,62 @@ class TemporalFlexCircuit:
         - ('t', q)
         - ('cx', control, target)
         - ('swap', q1, q2)
+
+        Pass validate=False to skip the qubit range checks for layers built
+        from trusted indices.
         """
+        dispatch = self._DISPATCH
+        qc = self.qc
         for g in gates:
-            if not isinstance(g, (list, tuple)) or len(g) < 2:
-                raise ValueError(f"Unsupported gate format: {g}")
-            name = str(g[0]).lower()
-            # single-qubit gates
-            if name in ("h", "x", "z", "s", "t") and len(g) == 2:
-                target = int(g[1])
-                self._validate_qubit_index(target)
-                getattr(self.qc, name)(target)
-            elif name == 'cx' and len(g) == 3:
-                c = int(g[1]); t = int(g[2])
-                self._validate_qubit_index(c); self._validate_qubit_index(t)
-                self.qc.cx(c, t)
-            elif name == 'swap' and len(g) == 3:
-                q1 = int(g[1]); q2 = int(g[2])
-                self._validate_qubit_index(q1); self._validate_qubit_index(q2)
-                self.qc.swap(q1, q2)
-            else:
+            entry = None
+            if isinstance(g, (list, tuple)) and len(g) >= 2:
+                name = g[0]
+                # exact lowercase names hit directly; anything else is normalized
+                entry = dispatch.get(name) if isinstance(name, str) else None
+                if entry is None:
+                    entry = dispatch.get(str(name).lower())
+            if entry is None or len(g) != entry[1] + 1:
                 raise ValueError(f"Unsupported gate format: {g}")
+            qubits = [int(q) for q in g[1:]]
+            if validate:
+                for q in qubits:
+                    self._validate_qubit_index(q)
+            entry[0](qc, *qubits)
 
     def _validate_qubit_index(self, idx: int) -> None:
         if not (0 <= idx < self.n):
             raise IndexError(f"Qubit index {idx} out of range (0..{self.n-1})")
 
     def measure(self, q_index: int) -> int:
-        """Measure the given qubit into a fresh 1-bit ClassicalRegister.
+        """Measure the given qubit into the next free preallocated classical bit.
 
-        Returns the index of the new classical register in self.cregs.
+        Returns the index of that bit in measurement order (across registers).
         """
         self._validate_qubit_index(q_index)
-        creg = ClassicalRegister(1, f'c{len(self.cregs)}')
+        if self.n_measured >= len(self._clbits):
+            # double the classical capacity in one new register
+            self._add_clbits(len(self._clbits))
+        bit_idx = self.n_measured
+        self.qc.measure(q_index, self._clbits[bit_idx])
+        self.n_measured += 1
+        self.measure_map[q_index] = bit_idx
+        return bit_idx
+
+    def _add_clbits(self, size: int) -> None:
+        n_regs = len(self.qc.cregs)
+        creg = ClassicalRegister(size, 'c' if n_regs == 0 else f'c{n_regs}')
         self.qc.add_register(creg)
-        self.qc.measure(q_index, creg[0])
-        self.cregs.append(creg)
-        creg_idx = len(self.cregs) - 1
-        self.measure_map[q_index] = creg_idx
-        return creg_idx
-
-    def _apply_conditional_single(self, gate_name: str, target: int, creg: ClassicalRegister, value: int) -> None:
-        gate_map = {'x': 'x', 'z': 'z', 'h': 'h', 's': 's', 't': 't'}
+        self._clbits.extend(creg)
+
+    def _apply_conditional_single(self, gate_name: str, target: int, clbit: Clbit, value: int) -> None:
         gate_name = gate_name.lower()
-        if gate_name not in gate_map:
+        entry = self._DISPATCH.get(gate_name)
+        if entry is None or entry[1] != 1:
             raise ValueError("Unsupported corrective gate: " + gate_name)
         self._validate_qubit_index(target)
         # Use modern Qiskit 2.x API with if_test context manager
-        with self.qc.if_test((creg, int(value))):
-            getattr(self.qc, gate_map[gate_name])(target)
+        with self.qc.if_test((clbit, int(value))):
+            entry[0](self.qc, target)
 
     def relative_corrective_block(self, measured_qubit: int, correction_map: Dict[Any, List[Tuple[str, int]]]) -> None:
         """
@@ -98,12 +130,12 @@ class TemporalFlexCircuit:
         """
         if measured_qubit not in self.measure_map:
             raise ValueError(f"Qubit {measured_qubit} hasn't been measured (call measure() first)")
-        creg = self.cregs[self.measure_map[measured_qubit]]
+        clbit = self._clbits[self.measure_map[measured_qubit]]
         for outcome, ops in correction_map.items():
             for gate_name, offset in ops:
                 target = (measured_qubit + int(offset)) % self.n
                 # apply the conditional corrective gate
-                self._apply_conditional_single(str(gate_name), target, creg, int(outcome))
+                self._apply_conditional_single(str(gate_name), target, clbit, int(outcome))
 
     def run_qasm(self, shots: int = 1024) -> Dict[str, int]:
         """
@@ -111,14 +143,25 @@ class TemporalFlexCircuit:
         Use qasm (counts) because statevector after mid-circuit measurement + classical
         conditional gates is not meaningful.
         """
-        # Use AerSimulator for modern Qiskit Aer provider
-        backend = AerSimulator()
-        # Run circuit directly on backend (Qiskit 2.x API)
-        job = backend.run(self.qc, shots=shots)
+        backend = self._get_backend()
+        # transpile once per circuit structure; repeated runs reuse the result
+        key = hashlib.sha1(qasm3.dumps(self.qc).encode()).hexdigest()
+        if self._transpiled is not None and self._transpiled[0] == key:
+            compiled = self._transpiled[1]
+        else:
+            compiled = transpile(self.qc, backend)
+            self._transpiled = (key, compiled)
+        job = backend.run(compiled, shots=shots)
         result = job.result()
         # return counts dict for convenience
         return result.get_counts()
 
+    @classmethod
+    def _get_backend(cls) -> AerSimulator:
+        if cls._backend is None:
+            cls._backend = AerSimulator()
+        return cls._backend
+
 
 def _teleportation_example() -> Dict[str, int]:
     """Build and run a deterministic teleportation test (|1> teleportation).
@@ -132,8 +175,8 @@ def _teleportation_example() -> Dict[str, int]:
     tfc.add_layer([('h', 1), ('cx', 1, 2)])
     # Bell measurement of q0 & q1
     tfc.add_layer([('cx', 0, 1), ('h', 0)])
-    tfc.measure(0)   # c0
-    tfc.measure(1)   # c1
+    tfc.measure(0)   # c[0]
+    tfc.measure(1)   # c[1]
     # Relative corrective blocks: conditional on those measurements apply
     tfc.relative_corrective_block(1, {1: [('x', 1)]})
     tfc.relative_corrective_block(0, {1: [('z', 2)]})